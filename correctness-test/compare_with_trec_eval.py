@@ -4,110 +4,279 @@ Script to check the correctness of elinor by comparing its output with trec_eval
 """
 
 import argparse
+import hashlib
+import itertools
+import json
+import math
+import os
+import re
+import shlex
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Directory to cache the parsed trec_eval outputs.
+CACHE_DIR = ".cache"
+
+# Line of trec_eval output: "<metric> <query_id> <value>".
+_TREC_EVAL_LINE_RE = re.compile(r"^(\S+)\s+\S+\s+(\S+)\s*$")
+
+# Line of elinor-evaluate output: "<metric> <value>".
+_ELINOR_LINE_RE = re.compile(r"^(\S+)\s+(\S+)\s*$")
+
+# Cutoffs of the metrics to compare.
+SUCCESS_KS = (1, 5, 10)
+KS = (5, 10, 15, 20, 30, 100, 200, 500, 1000)
+
+# Pairs of (trec_eval metric, elinor metric) to compare.
+# They do not depend on the input data, so they are built once at import time.
+METRIC_PAIRS: tuple[tuple[str, str], ...] = tuple(
+    itertools.chain(
+        ((f"success_{k}", f"success@{k}") for k in SUCCESS_KS),
+        (
+            ("set_P", "precision"),
+            ("set_recall", "recall"),
+            ("set_F", "f1"),
+            ("Rprec", "r_precision"),
+            ("map", "ap"),
+            ("recip_rank", "rr"),
+            ("ndcg", "ndcg"),
+            ("bpref", "bpref"),
+        ),
+        ((f"P_{k}", f"precision@{k}") for k in KS),
+        ((f"recall_{k}", f"recall@{k}") for k in KS),
+        ((f"map_cut_{k}", f"ap@{k}") for k in KS),
+        ((f"ndcg_cut_{k}", f"ndcg@{k}") for k in KS),
+    )
+)
+
+# Cutoffs passed to elinor-evaluate, where 0 means no cutoff.
+# Duplicates are removed so that each metric is computed only once.
+ELINOR_KS = tuple(dict.fromkeys((0, *SUCCESS_KS, *KS)))
+
+
+def _log(message: str) -> None:
+    # The evaluators run in worker threads, so write each message in one call
+    # to keep lines from being interleaved.
+    sys.stdout.write(f"{message}\n")
+
+
+def _popen(argv: list[str]) -> subprocess.Popen[str]:
+    try:
+        return subprocess.Popen(argv, stdout=subprocess.PIPE, encoding="utf-8")
+    except OSError as e:
+        print(f"Failed to run {argv[0]}: {e.strerror}", file=sys.stderr)
+        sys.exit(1)
 
 
 def run_trec_eval(
-    trec_eval_dir: str, qrels_file: str, results_file: str
+    trec_eval_dir: str, qrels_file: str, results_file: str, use_cache: bool = True
 ) -> dict[str, str]:
-    command = f"./{trec_eval_dir}/trec_eval -c -m all_trec {qrels_file} {results_file}"
-    print(f"Running: {command}")
-    result = subprocess.run(command, capture_output=True, shell=True)
-    if result.returncode != 0:
-        print(result.stderr.decode("utf-8"), file=sys.stderr)
+    argv = [f"./{trec_eval_dir}/trec_eval", "-c", "-m", "all_trec"]
+    argv.extend([qrels_file, results_file])
+
+    # trec_eval is the reference and its output depends only on the binary, the command,
+    # and the input files, so the parsed output can be reused across runs.
+    cache_file = None
+    if use_cache:
+        try:
+            cache_file = _trec_eval_cache_file(argv, qrels_file, results_file)
+        except OSError:
+            # A missing binary or input file is reported when trec_eval is run below.
+            cache_file = None
+    if cache_file is not None and os.path.exists(cache_file):
+        _log(f"Using cached output: {cache_file}")
+        with open(cache_file) as f:
+            return json.load(f)
+
+    _log(f"Running: {shlex.join(argv)}")
+    # The child's stderr is not captured, so it is shown as is on failure.
+    with _popen(argv) as proc:
+        # Blank lines do not match, so they need no separate check.
+        parsed: dict[str, str] = dict(
+            m.groups() for line in proc.stdout if (m := _TREC_EVAL_LINE_RE.match(line))
+        )
+    if proc.returncode != 0:
         sys.exit(1)
-    parsed: dict[str, str] = {}
-    for line in result.stdout.decode("utf-8").split("\n"):
-        if not line:
-            continue
-        metric, _, value = line.split()
-        parsed[metric] = value
+
+    if cache_file is not None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temporary file first so that an interrupted run leaves no broken cache.
+        fd, tmp_file = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(parsed, f)
+        os.replace(tmp_file, cache_file)
     return parsed
 
 
+def _trec_eval_cache_file(argv: list[str], qrels_file: str, results_file: str) -> str:
+    h = hashlib.sha256()
+    # The file paths are excluded from the command since their contents are hashed.
+    h.update("\0".join(argv[:-2]).encode("utf-8"))
+    # Include the identity of the executable so that a rebuilt trec_eval misses the cache.
+    st = os.stat(argv[0])
+    h.update(f"\0{st.st_mtime_ns}\0{st.st_size}\0".encode("utf-8"))
+    # Hash each file separately so that the split between the files is part of the key.
+    for file in (qrels_file, results_file):
+        with open(file, "rb") as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return os.path.join(CACHE_DIR, f"trec_eval_{h.hexdigest()}.json")
+
+
 def run_elinor_evaluate(
     elinor_dir: str, qrels_file: str, results_file: str
 ) -> dict[str, str]:
-    ks = [0, 1, 5, 10, 15, 20, 30, 100, 200, 500, 1000]
-    ks_args = " ".join([f"-k {k}" for k in ks])
-    command = (
-        f"./{elinor_dir}/elinor-evaluate -g {qrels_file} -p {results_file} {ks_args}"
-    )
-    print(f"Running: {command}")
-    result = subprocess.run(command, capture_output=True, shell=True)
-    if result.returncode != 0:
-        print(result.stderr.decode("utf-8"), file=sys.stderr)
+    argv = [f"./{elinor_dir}/elinor-evaluate", "-g", qrels_file, "-p", results_file]
+    for k in ELINOR_KS:
+        argv.extend(["-k", str(k)])
+    _log(f"Running: {shlex.join(argv)}")
+    with _popen(argv) as proc:
+        parsed: dict[str, str] = dict(
+            m.groups() for line in proc.stdout if (m := _ELINOR_LINE_RE.match(line))
+        )
+    if proc.returncode != 0:
         sys.exit(1)
-    parsed: dict[str, str] = {}
-    for line in result.stdout.decode("utf-8").split("\n"):
-        if not line:
-            continue
-        metric, value = line.split()
-        parsed[metric] = value
     return parsed
 
 
 def compare_decimal_places(a: str, b: str, decimal_places: int) -> bool:
-    return round(float(a), decimal_places) == round(float(b), decimal_places)
+    # Values match if they are within half a unit in the last decimal place.
+    # Unlike comparing rounded values, this accepts 0.1234 and 0.1236 at three places,
+    # but rejects 0.1236 and 0.1244 although both round to 0.124.
+    return math.isclose(float(a), float(b), abs_tol=0.5 * 10**-decimal_places)
 
 
-if __name__ == "__main__":
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser()
     p.add_argument("trec_eval_dir")
     p.add_argument("elinor_dir")
-    p.add_argument("--decimal-places", type=int, default=3)
-    args = p.parse_args()
+    p.add_argument(
+        "--decimal-places",
+        type=int,
+        default=3,
+        help="Scores match if they differ by at most half a unit in this decimal place",
+    )
+    p.add_argument("--no-cache", action="store_true")
+    p.add_argument(
+        "--pair",
+        nargs=2,
+        action="append",
+        default=[],
+        metavar=("QRELS_FILE", "RESULTS_FILE"),
+        help="Additional pair of files to compare, evaluated together with the test data",
+    )
+    p.add_argument(
+        "--pairs-file",
+        help='JSON Lines file of additional pairs with "qrels" and "results" fields',
+    )
+    p.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=os.cpu_count() or 1,
+        help="Maximum number of evaluator processes to run concurrently",
+    )
+    return p
+
+
+def _positive_int(value: str) -> int:
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return n
+
+
+def load_pairs(pairs_file: str) -> list[tuple[str, str]]:
+    # Relative paths are resolved against the directory of the pairs file.
+    base_dir = os.path.dirname(pairs_file)
+    pairs = []
+    with open(pairs_file, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                pair = json.loads(line)
+                qrels_file = os.path.join(base_dir, pair["qrels"])
+                results_file = os.path.join(base_dir, pair["results"])
+            except (ValueError, TypeError, KeyError):
+                print(
+                    f"{pairs_file}:{line_no}: expected an object with "
+                    f'"qrels" and "results" paths: {line.strip()}',
+                    file=sys.stderr,
+                )
+                sys.exit(1)
+            pairs.append((qrels_file, results_file))
+    return pairs
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
 
     trec_eval_dir: str = args.trec_eval_dir
     elinor_dir: str = args.elinor_dir
     decimal_places: int = args.decimal_places
+    use_cache: bool = not args.no_cache
 
     failed_ids = []
     test_data = [
         (f"{trec_eval_dir}/test/qrels.test", f"{trec_eval_dir}/test/results.test"),
         (f"{trec_eval_dir}/test/qrels.rel_level", f"{trec_eval_dir}/test/results.test"),
     ]
+    test_data.extend(map(tuple, args.pair))
+    if args.pairs_file is not None:
+        test_data.extend(load_pairs(args.pairs_file))
 
-    for data_id, (qrels_file, results_file) in enumerate(test_data, 1):
-        trec_results = run_trec_eval(trec_eval_dir, qrels_file, results_file)
-        elinor_results = run_elinor_evaluate(elinor_dir, qrels_file, results_file)
-
-        metric_pairs = []
-        metric_pairs.extend([(f"success_{k}", f"success@{k}") for k in [1, 5, 10]])
-        metric_pairs.extend(
-            [
-                ("set_P", "precision"),
-                ("set_recall", "recall"),
-                ("set_F", "f1"),
-                ("Rprec", "r_precision"),
-                ("map", "ap"),
-                ("recip_rank", "rr"),
-                ("ndcg", "ndcg"),
-                ("bpref", "bpref"),
-            ]
-        )
+    # The evaluators are independent child processes, so run all of them concurrently,
+    # with at most `--jobs` processes (the number of CPU cores by default).
+    max_workers = min(2 * len(test_data), args.jobs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (
+                executor.submit(
+                    run_trec_eval, trec_eval_dir, qrels_file, results_file, use_cache
+                ),
+                executor.submit(
+                    run_elinor_evaluate, elinor_dir, qrels_file, results_file
+                ),
+            )
+            for qrels_file, results_file in test_data
+        ]
+        all_results = [(f1.result(), f2.result()) for f1, f2 in futures]
 
-        ks = [5, 10, 15, 20, 30, 100, 200, 500, 1000]
-        metric_pairs.extend([(f"P_{k}", f"precision@{k}") for k in ks])
-        metric_pairs.extend([(f"recall_{k}", f"recall@{k}") for k in ks])
-        metric_pairs.extend([(f"map_cut_{k}", f"ap@{k}") for k in ks])
-        metric_pairs.extend([(f"ndcg_cut_{k}", f"ndcg@{k}") for k in ks])
-
-        print("case_id\ttrec_metric\telinor_metric\ttrec_score\telinor_score\tmatch")
-        for metric_id, (trec_metric, elinor_metric) in enumerate(metric_pairs, 1):
+    # Collect the rows of the report and write them in one call.
+    rows: list[str] = []
+    for data_id, (trec_results, elinor_results) in enumerate(all_results, 1):
+        rows.append(
+            "case_id\ttrec_metric\telinor_metric\ttrec_score\telinor_score\tmatch"
+        )
+        for metric_id, (trec_metric, elinor_metric) in enumerate(METRIC_PAIRS, 1):
             case_id = f"{data_id}.{metric_id}"
-            trec_score = trec_results[trec_metric]
-            elinor_score = elinor_results[elinor_metric]
-            match = compare_decimal_places(trec_score, elinor_score, decimal_places)
+            # A metric missing from either output is reported as a mismatch.
+            trec_score = trec_results.get(trec_metric)
+            elinor_score = elinor_results.get(elinor_metric)
+            match = (
+                trec_score is not None
+                and elinor_score is not None
+                and compare_decimal_places(trec_score, elinor_score, decimal_places)
+            )
             row = f"{case_id}\t{trec_metric}\t{elinor_metric}\t{trec_score}\t{elinor_score}\t{match}"
-            print(row)
+            rows.append(row)
 
             if not match:
                 failed_ids.append(case_id)
 
+    sys.stdout.write("\n".join(rows) + "\n")
+    sys.stdout.flush()
+
     if failed_ids:
         print("Mismatched cases:", failed_ids, file=sys.stderr)
         sys.exit(1)
     else:
         print(f"All metrics match 🎉 with {decimal_places=}")
+
+
+if __name__ == "__main__":
+    main()
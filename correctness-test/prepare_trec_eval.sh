@@ -1,15 +1,26 @@
 #! /bin/bash
 
-set -eux
+set -euxo pipefail
 
 # TREC EVAL
 TREC_VERSION="9.0.8"
-if [ -d "trec_eval-$TREC_VERSION" ]; then
-    echo "Directory trec_eval-$TREC_VERSION exists."
+TREC_DIR="trec_eval-$TREC_VERSION"
+if [ -d "$TREC_DIR" ]; then
+    echo "Directory $TREC_DIR exists."
 else
-    echo "Directory trec_eval-$TREC_VERSION does not exist."
-    rm -f v$TREC_VERSION.tar.gz
-    wget https://github.com/usnistgov/trec_eval/archive/refs/tags/v$TREC_VERSION.tar.gz
-    tar -xf v$TREC_VERSION.tar.gz
-    make -C trec_eval-$TREC_VERSION
+    echo "Directory $TREC_DIR does not exist."
+    # Extract the archive while downloading, without saving it to disk.
+    # It is extracted into a temporary directory next to $TREC_DIR and renamed only on success,
+    # so an interrupted download does not leave a partial $TREC_DIR behind.
+    TMP_DIR=$(mktemp -d ".$TREC_DIR.XXXXXX")
+    trap 'rm -rf "$TMP_DIR"' EXIT
+    wget -O- https://github.com/usnistgov/trec_eval/archive/refs/tags/v$TREC_VERSION.tar.gz | tar -xz -C "$TMP_DIR"
+    mv "$TMP_DIR/$TREC_DIR" .
+fi
+
+# Build only when the binary is missing or older than the Makefile.
+if [ "$TREC_DIR/trec_eval" -nt "$TREC_DIR/Makefile" ]; then
+    echo "$TREC_DIR/trec_eval is up to date."
+else
+    make -C "$TREC_DIR"
 fi
@@ -1,7 +1,4 @@
-use std::fs::File;
-use std::io::BufRead;
-use std::io::BufReader;
-use std::path::Path;
+use std::fs;
 use std::path::PathBuf;
 
 use clap::Parser;
@@ -24,8 +21,11 @@ struct Args {
 fn main() -> Result<(), Box<dyn std::error::Error>> {
     let args = Args::parse();
 
-    let gold_rels = trec::parse_gold_rels_in_trec(load_lines(&args.gold_file)?.into_iter())?;
-    let pred_rels = trec::parse_pred_rels_in_trec(load_lines(&args.pred_file)?.into_iter())?;
+    // Read each file into a single buffer and parse its lines.
+    let gold_data = fs::read_to_string(&args.gold_file)?;
+    let pred_data = fs::read_to_string(&args.pred_file)?;
+    let gold_rels = trec::parse_gold_rels_in_trec(gold_data.lines())?;
+    let pred_rels = trec::parse_pred_rels_in_trec(pred_data.lines())?;
 
     let metrics = all_metrics(&args.ks);
     for metric in metrics {
@@ -37,13 +37,6 @@ fn main() -> Result<(), Box<dyn std::error::Error>> {
     Ok(())
 }
 
-fn load_lines<P: AsRef<Path>>(file: P) -> Result<Vec<String>, Box<dyn std::error::Error>> {
-    let file = File::open(file)?;
-    let reader = BufReader::new(file);
-    let lines = reader.lines().collect::<Result<Vec<_>, _>>()?;
-    Ok(lines)
-}
-
 fn all_metrics(ks: &[usize]) -> Vec<Metric> {
     let mut metrics = Vec::new();
     metrics.extend(ks.iter().map(|&k| Metric::Hits { k }));
@@ -145,6 +145,7 @@
 //!
 //! # Crate features
 //!
+//! * `parallel` - Runs the resamples of [`statistical_tests::BootstrapTest`] in parallel with [rayon](https://docs.rs/rayon).
 //! * `serde` - Enables Serde for [`PredScore`].
 #![deny(missing_docs)]
 
@@ -235,13 +236,13 @@ where
     }
 
     // Sort query ids to ensure the order of paired scores.
-    let mut query_ids = a.keys().cloned().collect::<Vec<_>>();
+    let mut query_ids = a.keys().collect::<Vec<_>>();
     query_ids.sort_unstable();
 
-    let mut paired_scores = vec![];
+    let mut paired_scores = Vec::with_capacity(query_ids.len());
     for query_id in query_ids {
-        let score_a = a.get(&query_id).unwrap();
-        let score_b = b.get(&query_id).ok_or_else(|| {
+        let score_a = a.get(query_id).unwrap();
+        let score_b = b.get(query_id).ok_or_else(|| {
             ElinorError::InvalidArgument(format!(
                 "The query id {} is not found in the second evaluated result.",
                 query_id
@@ -278,14 +279,14 @@ where
         }
     }
 
-    let mut query_ids = score_maps[0].keys().cloned().collect::<Vec<_>>();
+    let mut query_ids = score_maps[0].keys().collect::<Vec<_>>();
     query_ids.sort_unstable();
 
-    let mut tupled_scores = vec![];
+    let mut tupled_scores = Vec::with_capacity(query_ids.len());
     for query_id in query_ids {
-        let mut scores = vec![];
+        let mut scores = Vec::with_capacity(score_maps.len());
         for score_map in &score_maps {
-            if let Some(score) = score_map.get(&query_id) {
+            if let Some(score) = score_map.get(query_id) {
                 scores.push(*score);
             } else {
                 return Err(ElinorError::InvalidArgument(format!(
@@ -326,15 +326,13 @@ pub fn compute_metric<K>(
 where
     K: Clone + Eq + Ord + std::hash::Hash + std::fmt::Display,
 {
+    let mut results = HashMap::with_capacity(pred_rels.n_queries());
     for query_id in pred_rels.query_ids() {
-        if gold_rels.get_map(query_id).is_none() {
-            return Err(ElinorError::MissingEntry(format!("Query ID: {query_id}")));
-        }
-    }
-    let mut results = HashMap::new();
-    for query_id in pred_rels.query_ids() {
+        // Every query in pred_rels must have the gold entry.
+        let golds = gold_rels
+            .get_map(query_id)
+            .ok_or_else(|| ElinorError::MissingEntry(format!("Query ID: {query_id}")))?;
         let sorted_preds = pred_rels.get_sorted(query_id).unwrap();
-        let golds = gold_rels.get_map(query_id).unwrap();
         let score = match metric {
             Metric::Hits { k } => hits::compute_hits(golds, sorted_preds, k, RELEVANT_LEVEL),
             Metric::Success { k } => {
@@ -507,6 +505,28 @@ mod tests {
         compare_hashmaps(&results, &expected);
     }
 
+    #[test]
+    fn test_compute_metric_missing_query_id() {
+        let gold_rels = GoldRelStore::from_map(hashmap! {
+            'A' => hashmap! {
+                'X' => 1,
+            },
+        });
+        let pred_rels = PredRelStore::from_map(hashmap! {
+            'A' => hashmap! {
+                'X' => 0.5.into(),
+            },
+            'B' => hashmap! {
+                'X' => 0.5.into(),
+            },
+        });
+        let result = compute_metric(&gold_rels, &pred_rels, Metric::Precision { k: 0 });
+        assert_eq!(
+            result.unwrap_err(),
+            ElinorError::MissingEntry("Query ID: B".to_string())
+        );
+    }
+
     #[rstest]
     #[case::hits("hits", Metric::Hits { k: 0 })]
     #[case::hits_k0("hits@0", Metric::Hits { k: 0 })]
@@ -161,7 +161,7 @@ impl<K, T> RelevanceStoreBuilder<K, T> {
         K: Eq + Ord + Hash + Clone + Display,
         T: Ord + Clone,
     {
-        let mut map = HashMap::new();
+        let mut map = HashMap::with_capacity(self.map.len());
         for (query_id, rels) in self.map {
             let mut sorted = rels
                 .iter()
@@ -1,12 +1,19 @@
 //! Bootstrap test.
 
+use rand::distributions::Distribution;
+use rand::distributions::Uniform;
 use rand::rngs::StdRng;
 use rand::Rng;
 use rand::SeedableRng;
+#[cfg(feature = "parallel")]
+use rayon::prelude::*;
 
 use crate::errors::ElinorError;
 use crate::statistical_tests::student_t_test::compute_t_stat;
 
+/// Number of resamples processed by a single task.
+const N_RESAMPLES_PER_TASK: usize = 100;
+
 /// Bootstrap test.
 ///
 /// # Examples
@@ -124,6 +131,13 @@ impl BootstrapTest {
 /// * `n_resamples`: `1000`
 /// * `random_state`: `None`
 ///
+/// # Parallelism
+///
+/// If the `parallel` feature is enabled,
+/// the resamples are processed in parallel on the global [rayon](https://docs.rs/rayon) thread pool,
+/// whose size can be controlled with the `RAYON_NUM_THREADS` environment variable.
+/// The result for a given `random_state` does not depend on the feature or the number of threads.
+///
 /// # References
 ///
 /// The default parameter `n_resamples = 1000` is based on the paper:
@@ -196,18 +210,26 @@ impl BootstrapTester {
         let samples: Vec<f64> = samples.iter().map(|x| x - mean).collect();
 
         // Perform the bootstrap test.
-        let mut count: usize = 0;
-        for _ in 0..self.n_resamples {
-            let resampled: Vec<f64> = (0..samples.len())
-                .map(|_| samples[rng.gen_range(0..samples.len())])
-                .collect();
-            // If samples.len() is small, the variance may be zero.
-            // In that unfortunate case, we skip the counting.
-            let (resampled_t_stat, _, _) = compute_t_stat(&resampled).unwrap_or((0.0, 0.0, 0.0));
-            if resampled_t_stat.abs() >= t_stat.abs() {
-                count += 1;
-            }
-        }
+        // The resamples are split into tasks, which are processed in parallel
+        // if the `parallel` feature is enabled.
+        // Each task has its own generator seeded from the main one,
+        // so the result does not depend on the number of threads.
+        let n_tasks = (self.n_resamples + N_RESAMPLES_PER_TASK - 1) / N_RESAMPLES_PER_TASK;
+        let tasks: Vec<(u64, usize)> = (0..n_tasks)
+            .map(|task_id| {
+                let n_resamples =
+                    N_RESAMPLES_PER_TASK.min(self.n_resamples - task_id * N_RESAMPLES_PER_TASK);
+                (rng.gen(), n_resamples)
+            })
+            .collect();
+        let index_dist = Uniform::new(0, samples.len());
+        let run_task = |(task_seed, n_resamples): (u64, usize)| {
+            count_extreme_resamples(&samples, index_dist, t_stat, task_seed, n_resamples)
+        };
+        #[cfg(feature = "parallel")]
+        let count: usize = tasks.into_par_iter().map(run_task).sum();
+        #[cfg(not(feature = "parallel"))]
+        let count: usize = tasks.into_iter().map(run_task).sum();
         let p_value = count as f64 / self.n_resamples as f64;
 
         Ok(BootstrapTest {
@@ -236,6 +258,32 @@ impl BootstrapTester {
     }
 }
 
+/// Counts the resamples whose t-statistic is at least as extreme as `t_stat`.
+fn count_extreme_resamples(
+    samples: &[f64],
+    index_dist: Uniform<usize>,
+    t_stat: f64,
+    seed: u64,
+    n_resamples: usize,
+) -> usize {
+    let mut rng = StdRng::seed_from_u64(seed);
+    // The resample buffer is reused across the resamples.
+    let mut resampled = vec![0.0; samples.len()];
+    let mut count: usize = 0;
+    for _ in 0..n_resamples {
+        for x in resampled.iter_mut() {
+            *x = samples[index_dist.sample(&mut rng)];
+        }
+        // If samples.len() is small, the variance may be zero.
+        // In that unfortunate case, we skip the counting.
+        let (resampled_t_stat, _, _) = compute_t_stat(&resampled).unwrap_or((0.0, 0.0, 0.0));
+        if resampled_t_stat.abs() >= t_stat.abs() {
+            count += 1;
+        }
+    }
+    count
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -295,4 +343,25 @@ mod tests {
         let x = p_values[0];
         assert!(p_values.iter().all(|&y| relative_eq!(x, y)));
     }
+
+    #[cfg(feature = "parallel")]
+    #[test]
+    fn test_bootstrap_tester_with_random_state_thread_independence() {
+        let samples = (0..10).map(|x| x as f64).collect::<Vec<f64>>();
+        let p_values: Vec<f64> = [1, 4]
+            .into_iter()
+            .map(|num_threads| {
+                let pool = rayon::ThreadPoolBuilder::new()
+                    .num_threads(num_threads)
+                    .build()
+                    .unwrap();
+                pool.install(|| {
+                    let tester = BootstrapTester::new().with_random_state(42);
+                    let result = tester.test(samples.clone()).unwrap();
+                    result.p_value()
+                })
+            })
+            .collect();
+        assert_eq!(p_values[0], p_values[1]);
+    }
 }
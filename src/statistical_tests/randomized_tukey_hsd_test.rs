@@ -181,27 +181,29 @@ impl RandomizedTukeyHsdTester {
         I: IntoIterator<Item = S>,
         S: AsRef<[f64]>,
     {
-        let samples: Vec<Vec<f64>> = samples
-            .into_iter()
-            .map(|sample| {
-                let sample = sample.as_ref();
-                if sample.len() != self.n_systems {
-                    return Err(ElinorError::InvalidArgument(
-                        "The length of each sample must be equal to the number of systems."
-                            .to_string(),
-                    ));
-                }
-                Ok(sample.to_vec())
-            })
-            .collect::<Result<_, _>>()?;
+        // Store the samples in a flat row-major matrix of shape (n_topics, n_systems),
+        // so that the loops below work on a single contiguous buffer.
+        let n_systems = self.n_systems;
+        let mut flat_samples = Vec::new();
+        let mut n_topics = 0;
+        for sample in samples {
+            let sample = sample.as_ref();
+            if sample.len() != n_systems {
+                return Err(ElinorError::InvalidArgument(
+                    "The length of each sample must be equal to the number of systems.".to_string(),
+                ));
+            }
+            flat_samples.extend_from_slice(sample);
+            n_topics += 1;
+        }
 
-        if samples.is_empty() {
+        if n_topics == 0 {
             return Err(ElinorError::InvalidArgument(
                 "The input must have at least one sample.".to_string(),
             ));
         }
 
-        let n_samples = samples.len() as f64;
+        let n_samples = n_topics as f64;
 
         // Prepare the random number generator.
         let random_state = self
@@ -210,12 +212,17 @@ impl RandomizedTukeyHsdTester {
         let mut rng = StdRng::seed_from_u64(random_state);
 
         // Compute the means of each system.
-        let means = (0..self.n_systems)
-            .map(|i| samples.iter().map(|sample| sample[i]).sum::<f64>() / n_samples)
+        let means = (0..n_systems)
+            .map(|i| {
+                (0..n_topics)
+                    .map(|j| flat_samples[j * n_systems + i])
+                    .sum::<f64>()
+                    / n_samples
+            })
             .collect_vec();
 
         // All possible combinations of two systems.
-        let combis = (0..self.n_systems)
+        let combis = (0..n_systems)
             .combinations(2)
             .map(|c| (c[0], c[1]))
             .collect_vec();
@@ -226,18 +233,23 @@ impl RandomizedTukeyHsdTester {
             .map(|&(a, b)| means[a] - means[b])
             .collect_vec();
 
+        // Buffers reused across the iterations.
+        let mut shuffled_samples = vec![0.0; flat_samples.len()];
+        let mut shuffled_means = vec![0.0; n_systems];
+
         let mut counts = vec![0usize; diffs.len()];
         for _ in 0..self.n_iters {
-            let mut shuffled_samples = Vec::with_capacity(samples.len());
-            for sample in &samples {
-                let mut shuffled_sample = sample.clone();
-                shuffled_sample.shuffle(&mut rng);
-                shuffled_samples.push(shuffled_sample);
+            shuffled_samples.copy_from_slice(&flat_samples);
+            for j in 0..n_topics {
+                shuffled_samples[j * n_systems..(j + 1) * n_systems].shuffle(&mut rng);
             }
 
-            let shuffled_means = (0..self.n_systems)
-                .map(|i| shuffled_samples.iter().map(|sample| sample[i]).sum::<f64>() / n_samples)
-                .collect_vec();
+            for (i, mean) in shuffled_means.iter_mut().enumerate() {
+                *mean = (0..n_topics)
+                    .map(|j| shuffled_samples[j * n_systems + i])
+                    .sum::<f64>()
+                    / n_samples;
+            }
 
             let shuffled_diff = shuffled_means.as_slice().max() - shuffled_means.as_slice().min();
             for (&diff, count) in diffs.iter().zip(counts.iter_mut()) {
@@ -51,41 +51,49 @@ impl TwoWayAnovaWithoutReplication {
         I: IntoIterator<Item = S>,
         S: AsRef<[f64]>,
     {
-        let samples: Vec<Vec<f64>> = samples
-            .into_iter()
-            .map(|sample| {
-                let sample = sample.as_ref();
-                if sample.len() != n_systems {
-                    return Err(ElinorError::InvalidArgument(
-                        "The length of each sample must be equal to the number of systems."
-                            .to_string(),
-                    ));
-                }
-                Ok(sample.to_vec())
-            })
-            .collect::<Result<_, _>>()?;
+        // Store the samples in a flat row-major matrix of shape (n_topics, n_systems),
+        // so that the loops below work on a single contiguous buffer.
+        let mut flat_samples = Vec::new();
+        let mut n_topics = 0;
+        for sample in samples {
+            let sample = sample.as_ref();
+            if sample.len() != n_systems {
+                return Err(ElinorError::InvalidArgument(
+                    "The length of each sample must be equal to the number of systems.".to_string(),
+                ));
+            }
+            flat_samples.extend_from_slice(sample);
+            n_topics += 1;
+        }
 
-        if samples.len() <= 1 {
+        if n_topics <= 1 {
             return Err(ElinorError::InvalidArgument(
                 "The input must have at least two samples.".to_string(),
             ));
         }
 
-        let n_topics_f = samples.len() as f64;
+        let n_topics_f = n_topics as f64;
         let n_systems_f = n_systems as f64;
 
         // Mean of all samples (x_{..}).
-        let overall_mean = samples.iter().flatten().mean();
+        let overall_mean = flat_samples.iter().mean();
 
         // Mean of each system (x_{i.*}).
         let system_means = (0..n_systems)
-            .map(|j| samples.iter().map(|sample| sample[j]).sum::<f64>() / n_topics_f)
+            .map(|i| {
+                (0..n_topics)
+                    .map(|j| flat_samples[j * n_systems + i])
+                    .sum::<f64>()
+                    / n_topics_f
+            })
             .collect::<Vec<_>>();
 
         // Mean of each topic (x_{*.j}).
-        let topic_means = samples
-            .iter()
-            .map(|sample| sample.mean())
+        let topic_means = (0..n_topics)
+            .map(|j| {
+                let topic_samples = &flat_samples[j * n_systems..(j + 1) * n_systems];
+                topic_samples.mean()
+            })
             .collect::<Vec<_>>();
 
         // S_A
@@ -103,10 +111,9 @@ impl TwoWayAnovaWithoutReplication {
             * n_systems_f;
 
         // S_E
-        let residual_variation = samples
-            .iter()
-            .enumerate()
-            .map(|(j, topic_samples)| {
+        let residual_variation = (0..n_topics)
+            .map(|j| {
+                let topic_samples = &flat_samples[j * n_systems..(j + 1) * n_systems];
                 topic_samples
                     .iter()
                     .enumerate()
@@ -151,7 +158,7 @@ impl TwoWayAnovaWithoutReplication {
         .expect("Failed to create a Student's t distribution.");
 
         Ok(Self {
-            n_topics: samples.len(),
+            n_topics,
             n_systems,
             system_means,
             topic_means,
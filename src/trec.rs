@@ -43,17 +43,16 @@ where
     let mut b = GoldRelStoreBuilder::new();
     for line in lines {
         let line = line.as_ref();
-        let rows = line.split_whitespace().collect::<Vec<_>>();
-        if rows.len() < 4 {
-            return Err(ElinorError::InvalidFormat(line.to_string()));
-        }
-        let query_id = rows[0].to_string();
-        let doc_id = rows[2].to_string();
-        let score = rows[3]
+        let mut rows = line.split_whitespace();
+        let (query_id, doc_id, score) = match (rows.next(), rows.next(), rows.next(), rows.next()) {
+            (Some(query_id), Some(_), Some(doc_id), Some(score)) => (query_id, doc_id, score),
+            _ => return Err(ElinorError::InvalidFormat(line.to_string())),
+        };
+        let score = score
             .parse::<i32>()
-            .map_err(|_| ElinorError::InvalidFormat(format!("Invalid score: {}", rows[3])))?;
+            .map_err(|_| ElinorError::InvalidFormat(format!("Invalid score: {score}")))?;
         let score = GoldScore::try_from(score.max(0)).unwrap();
-        b.add_score(query_id, doc_id, score)?;
+        b.add_score(query_id.to_string(), doc_id.to_string(), score)?;
     }
     Ok(b.build())
 }
@@ -95,16 +94,68 @@ where
     let mut b = PredRelStoreBuilder::new();
     for line in lines {
         let line = line.as_ref();
-        let rows = line.split_whitespace().collect::<Vec<_>>();
-        if rows.len() < 5 {
-            return Err(ElinorError::InvalidFormat(line.to_string()));
-        }
-        let query_id = rows[0].to_string();
-        let doc_id = rows[2].to_string();
-        let score = rows[4]
+        let mut rows = line.split_whitespace();
+        let (query_id, doc_id, score) = match (
+            rows.next(),
+            rows.next(),
+            rows.next(),
+            rows.next(),
+            rows.next(),
+        ) {
+            (Some(query_id), Some(_), Some(doc_id), Some(_), Some(score)) => {
+                (query_id, doc_id, score)
+            }
+            _ => return Err(ElinorError::InvalidFormat(line.to_string())),
+        };
+        let score = score
             .parse::<PredScore>()
-            .map_err(|_| ElinorError::InvalidFormat(format!("Invalid score: {}", rows[4])))?;
-        b.add_score(query_id, doc_id, score)?;
+            .map_err(|_| ElinorError::InvalidFormat(format!("Invalid score: {score}")))?;
+        b.add_score(query_id.to_string(), doc_id.to_string(), score)?;
     }
     Ok(b.build())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_parse_gold_rels_in_trec_missing_field() {
+        let data = "q_1 0 d_1";
+        let result = parse_gold_rels_in_trec(data.lines());
+        assert_eq!(
+            result.err(),
+            Some(ElinorError::InvalidFormat("q_1 0 d_1".to_string()))
+        );
+    }
+
+    #[test]
+    fn test_parse_gold_rels_in_trec_invalid_score() {
+        let data = "q_1 0 d_1 a";
+        let result = parse_gold_rels_in_trec(data.lines());
+        assert_eq!(
+            result.err(),
+            Some(ElinorError::InvalidFormat("Invalid score: a".to_string()))
+        );
+    }
+
+    #[test]
+    fn test_parse_pred_rels_in_trec_missing_field() {
+        let data = "q_1 0 d_1 1";
+        let result = parse_pred_rels_in_trec(data.lines());
+        assert_eq!(
+            result.err(),
+            Some(ElinorError::InvalidFormat("q_1 0 d_1 1".to_string()))
+        );
+    }
+
+    #[test]
+    fn test_parse_pred_rels_in_trec_invalid_score() {
+        let data = "q_1 0 d_1 1 a SAMPLE";
+        let result = parse_pred_rels_in_trec(data.lines());
+        assert_eq!(
+            result.err(),
+            Some(ElinorError::InvalidFormat("Invalid score: a".to_string()))
+        );
+    }
+}